@@ -8,17 +8,92 @@ Cycle time = time spent in Doing, Blocked, or Review statuses.
 
 import os
 import sys
-import json
-import csv
 import argparse
 import time
 import random
+import threading
+from functools import lru_cache
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import orjson
+import pandas as pd
 import requests
 from requests.auth import HTTPBasicAuth
 
 
+@lru_cache(maxsize=8192)
+def _parse_datetime(date_str: str) -> datetime:
+    """
+    Parse a JIRA datetime string.
+
+    Memoized: changelog entries frequently repeat timestamps (several items
+    per history share one 'created'), and fromisoformat handles the standard
+    JIRA formats in C, so strptime only runs for unusual inputs.
+    """
+    try:
+        return datetime.fromisoformat(date_str)
+    except ValueError:
+        pass
+
+    # Handle different JIRA datetime formats
+    for fmt in ['%Y-%m-%dT%H:%M:%S.%f%z', '%Y-%m-%dT%H:%M:%S%z']:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+
+    # Fallback: remove timezone info and parse
+    if '+' in date_str:
+        date_str = date_str.split('+')[0]
+    elif 'Z' in date_str:
+        date_str = date_str.replace('Z', '')
+
+    return datetime.fromisoformat(date_str)
+
+
+def _reduce_status_events(change_ts: np.ndarray, from_cycle: np.ndarray, to_cycle: np.ndarray,
+                          created_ts: float) -> Tuple[float, np.ndarray, np.ndarray, bool, int]:
+    """
+    Vectorized reduction over time-sorted status-change events.
+
+    Args:
+        change_ts: event timestamps (epoch seconds, sorted ascending)
+        from_cycle: whether each event left a cycle time status
+        to_cycle: whether each event entered a cycle time status
+        created_ts: issue creation timestamp (epoch seconds)
+
+    Returns:
+        Tuple of (closed_period_seconds, contributing_event_mask,
+        period_start_indices, open_period_active, open_period_start_index).
+        A start index of -1 means the period started at issue creation.
+    """
+    n = change_ts.shape[0]
+    idx = np.arange(n)
+
+    # An open period starts at the latest cycle-status entry and is closed by a
+    # later exit to a non-cycle status. Closing an already-closed period is a
+    # no-op, so activity reduces to a race between the two running indices.
+    last_entry = np.maximum.accumulate(np.where(to_cycle, idx, -1))
+    last_exit = np.maximum.accumulate(np.where(from_cycle & ~to_cycle, idx, -1))
+    prev_entry = np.concatenate(([-1], last_entry[:-1]))
+    prev_exit = np.concatenate(([-1], last_exit[:-1]))
+
+    # The creation date seeds an open period when the first transition enters a
+    # cycle time status (the issue was presumably in it since creation)
+    seeded = bool(to_cycle[0])
+    active_before = (prev_entry > prev_exit) | (seeded & (prev_exit == -1))
+
+    contributing = from_cycle & active_before
+    start_ts = np.where(prev_entry >= 0, change_ts[np.maximum(prev_entry, 0)], created_ts)
+    closed_seconds = float(np.sum(change_ts[contributing] - start_ts[contributing]))
+
+    open_active = bool(last_entry[-1] > last_exit[-1]) or (seeded and last_exit[-1] == -1)
+    return closed_seconds, contributing, prev_entry, open_active, int(last_entry[-1])
+
+
 class JiraMetricsExtractor:
     def __init__(self, base_url: str, username: str, api_token: str):
         """Initialize the JIRA metrics extractor."""
@@ -26,37 +101,83 @@ class JiraMetricsExtractor:
         self.auth = HTTPBasicAuth(username, api_token)
         self.session = requests.Session()
         self.session.auth = self.auth
+
+        # Size the keep-alive pool to the concurrent fetch cap so workers
+        # reuse warm TLS connections instead of re-handshaking, and ask for
+        # gzip explicitly: changelog JSON compresses several-fold on the wire
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=20)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
         
         # Default cycle time statuses - can be customized
         self.cycle_time_statuses = {'Doing', 'Blocked', 'Review', 'In Progress', 'In Review'}
+        self._rebuild_status_codes()
         
-        # Rate limiting configuration
+        # Rate limiting configuration: a token bucket shared by all workers.
+        # Bursts up to ~10 seconds of budget go through without sleeping.
         self.requests_per_minute = 60  # Conservative default
-        self.request_interval = 60.0 / self.requests_per_minute  # seconds between requests
-        self.last_request_time = 0
         self.max_retries = 5
         self.base_backoff = 1.0  # seconds
+        self._rate_lock = threading.Lock()  # workers share the rate budget
+        self._rate = self.requests_per_minute / 60.0  # tokens per second
+        self._capacity = max(1, self.requests_per_minute // 6)
+        self._tokens = float(self._capacity)
+        self._last_refill = time.monotonic()
+        self._retry_gate = threading.Semaphore(4)  # cap concurrent backoff waits
     
     def set_cycle_time_statuses(self, statuses: List[str]):
         """Set custom statuses that count toward cycle time."""
         self.cycle_time_statuses = set(statuses)
+        self._rebuild_status_codes()
+
+    def _rebuild_status_codes(self):
+        """
+        Number status names with small ints so cycle membership is a bitmask
+        test instead of a string hash per changelog entry. Cycle statuses get
+        the low codes; other statuses are numbered lazily as they are seen.
+        """
+        self._status_code = {status: code for code, status in enumerate(self.cycle_time_statuses)}
+        self._cycle_mask = (1 << len(self._status_code)) - 1
     
     def set_rate_limit(self, requests_per_minute: int):
         """Set the rate limit for API requests."""
         self.requests_per_minute = requests_per_minute
-        self.request_interval = 60.0 / self.requests_per_minute
-    
+        with self._rate_lock:
+            self._rate = requests_per_minute / 60.0
+            self._capacity = max(1, requests_per_minute // 6)
+            self._tokens = float(self._capacity)
+            self._last_refill = time.monotonic()
+
     def _rate_limit(self):
-        """Enforce rate limiting between requests."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.request_interval:
-            sleep_time = self.request_interval - time_since_last
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
-    
+        """Take a token from the shared bucket, sleeping only when it is empty."""
+        while True:
+            with self._rate_lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity,
+                                   self._tokens + (now - self._last_refill) * self._rate)
+                self._last_refill = now
+
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+
+                wait_time = (1.0 - self._tokens) / self._rate
+
+            # Sleep outside the lock, then re-check: another worker may have
+            # taken the token that accrued in the meantime
+            time.sleep(wait_time)
+
+    def _backoff_wait(self, wait_time: float):
+        """
+        Wait out a retry backoff. The worker holds no rate-limit token while
+        waiting, so other in-flight requests keep spending the budget, and
+        the gate caps how many workers can be in backoff at once so a 429
+        storm cannot requeue retries faster than the token bucket refills.
+        """
+        with self._retry_gate:
+            time.sleep(wait_time)
+
     def _make_request_with_retry(self, method: str, url: str, **kwargs) -> requests.Response:
         """Make HTTP request with exponential backoff retry logic."""
         for attempt in range(self.max_retries):
@@ -72,7 +193,7 @@ class JiraMetricsExtractor:
                     wait_time = retry_after + jitter
                     
                     print(f"Rate limited (429). Waiting {wait_time:.1f} seconds before retry {attempt + 1}/{self.max_retries}")
-                    time.sleep(wait_time)
+                    self._backoff_wait(wait_time)
                     continue
                 
                 # Handle server errors with exponential backoff
@@ -82,7 +203,7 @@ class JiraMetricsExtractor:
                     
                     backoff_time = (self.base_backoff * (2 ** attempt)) + random.uniform(0, 1)
                     print(f"Server error {response.status_code}. Retrying in {backoff_time:.1f} seconds (attempt {attempt + 1}/{self.max_retries})")
-                    time.sleep(backoff_time)
+                    self._backoff_wait(backoff_time)
                     continue
                 
                 # Success or client error (don't retry client errors)
@@ -95,7 +216,7 @@ class JiraMetricsExtractor:
                 
                 backoff_time = (self.base_backoff * (2 ** attempt)) + random.uniform(0, 1)
                 print(f"Request failed: {e}. Retrying in {backoff_time:.1f} seconds (attempt {attempt + 1}/{self.max_retries})")
-                time.sleep(backoff_time)
+                self._backoff_wait(backoff_time)
         
         raise Exception(f"Failed to complete request after {self.max_retries} attempts")
     
@@ -128,14 +249,31 @@ class JiraMetricsExtractor:
             
             response = self._make_request_with_retry('GET', url, params=params)
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
-            # Get detailed issue data for each issue ID
-            for issue_summary in data.get('issues', []):
-                issue_id = issue_summary['id']
-                issue_detail = self._get_issue_detail(issue_id)
-                if issue_detail:
-                    issues.append(issue_detail)
+            # The search response already carries full changelogs thanks to
+            # expand=changelog; a per-issue detail fetch is only needed when
+            # JIRA truncated the inline history list.
+            page_issues = data.get('issues', [])
+            detail_ids = [issue['id'] for issue in page_issues
+                          if not self._has_complete_changelog(issue)]
+
+            issue_details = {}
+            if detail_ids:
+                # Fetch the stragglers concurrently; the round-trips are
+                # IO-bound and the shared rate limiter keeps us within budget
+                max_workers = min(16, max(1, self.requests_per_minute // 4))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    issue_details = dict(zip(detail_ids,
+                                             executor.map(self._get_issue_detail, detail_ids)))
+
+            for issue in page_issues:
+                if self._has_complete_changelog(issue):
+                    issues.append(issue)
+                else:
+                    issue_detail = issue_details.get(issue['id'])
+                    if issue_detail:
+                        issues.append(issue_detail)
             
             if data.get('isLast', True) or not data.get('nextPageToken'):
                 break
@@ -162,7 +300,7 @@ class JiraMetricsExtractor:
             
             response = self._make_request_with_retry('GET', url, params=params)
             
-            data = response.json()
+            data = orjson.loads(response.content)
             issues.extend(data.get('issues', []))
             
             if len(data.get('issues', [])) == 0 or data.get('total', 0) <= len(issues):
@@ -172,6 +310,14 @@ class JiraMetricsExtractor:
         
         return issues
     
+    @staticmethod
+    def _has_complete_changelog(issue: Dict) -> bool:
+        """Check whether the search response included the issue's full changelog."""
+        changelog = issue.get('changelog')
+        if changelog is None:
+            return False
+        return changelog.get('total', 0) <= len(changelog.get('histories', []))
+
     def _get_issue_detail(self, issue_id: str) -> Optional[Dict]:
         """Get detailed issue information including changelog."""
         url = f"{self.base_url}/rest/api/3/issue/{issue_id}"
@@ -182,129 +328,122 @@ class JiraMetricsExtractor:
         
         try:
             response = self._make_request_with_retry('GET', url, params=params)
-            return response.json()
+            return orjson.loads(response.content)
         except Exception as e:
             print(f"Failed to get details for issue {issue_id}: {e}")
             return None
     
     def parse_datetime(self, date_str: str) -> datetime:
         """Parse JIRA datetime string."""
-        # Handle different JIRA datetime formats
-        for fmt in ['%Y-%m-%dT%H:%M:%S.%f%z', '%Y-%m-%dT%H:%M:%S%z']:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-        
-        # Fallback: remove timezone info and parse
-        if '+' in date_str:
-            date_str = date_str.split('+')[0]
-        elif 'Z' in date_str:
-            date_str = date_str.replace('Z', '')
-        
-        return datetime.fromisoformat(date_str)
+        return _parse_datetime(date_str)
     
     def calculate_cycle_time(self, issue: Dict) -> Tuple[float, List[Dict]]:
         """
         Calculate cycle time for an issue.
         
         Returns:
-            Tuple of (total_cycle_time_hours, status_periods)
+            Tuple of (total_cycle_time_days, status_periods)
         """
         changelog = issue.get('changelog', {})
         histories = changelog.get('histories', [])
         
         if not histories:
             return 0.0, []
-        
-        # Track status changes
-        status_changes = []
-        
-        # Add initial status (created)
+
         created_date = self.parse_datetime(issue['fields']['created'])
-        current_status = None  # We don't know the initial status from creation
-        
-        # Process changelog to find status changes
-        for history in sorted(histories, key=lambda x: x['created']):
+
+        # Extract status changes into parallel arrays (timestamps + cycle
+        # flags) in one unsorted pass; chronological order is restored below
+        # with a single C-level argsort on the timestamp array rather than
+        # sorting the history dicts by their ISO strings
+        change_dates = []
+        from_statuses = []
+        to_statuses = []
+
+        for history in histories:
             change_date = self.parse_datetime(history['created'])
-            
+
             for item in history['items']:
                 if item['field'] == 'status':
-                    from_status = item.get('fromString')
-                    to_status = item.get('toString')
-                    
-                    status_changes.append({
-                        'date': change_date,
-                        'from_status': from_status,
-                        'to_status': to_status
-                    })
-        
-        # Calculate time in cycle time statuses
-        total_cycle_time = 0.0
+                    change_dates.append(change_date)
+                    from_statuses.append(item.get('fromString'))
+                    to_statuses.append(item.get('toString'))
+
+        if not change_dates:
+            return 0.0, []
+
+        n = len(change_dates)
+        change_ts = np.fromiter((d.timestamp() for d in change_dates), dtype=np.float64, count=n)
+
+        order = np.argsort(change_ts, kind='stable')
+        change_ts = change_ts[order]
+        change_dates = [change_dates[i] for i in order]
+        from_statuses = [from_statuses[i] for i in order]
+        to_statuses = [to_statuses[i] for i in order]
+
+        # Translate status names to codes once, then test cycle membership
+        # with a single shift/and against the precomputed mask
+        status_code = self._status_code
+        cycle_mask = self._cycle_mask
+        from_codes = [status_code.setdefault(s, len(status_code)) for s in from_statuses]
+        to_codes = [status_code.setdefault(s, len(status_code)) for s in to_statuses]
+        from_cycle = np.fromiter(((cycle_mask >> code) & 1 for code in from_codes), dtype=bool, count=n)
+        to_cycle = np.fromiter(((cycle_mask >> code) & 1 for code in to_codes), dtype=bool, count=n)
+
+        total_seconds, contributing, start_indices, open_active, open_start = _reduce_status_events(
+            change_ts, from_cycle, to_cycle, created_date.timestamp()
+        )
+
+        total_cycle_time = total_seconds / 86400.0
         status_periods = []
-        current_cycle_start = None
-        
-        # Start from creation if first status is a cycle time status
-        if status_changes and status_changes[0]['to_status'] in self.cycle_time_statuses:
-            current_cycle_start = created_date
-        
-        for i, change in enumerate(status_changes):
-            from_status = change['from_status']
-            to_status = change['to_status']
-            change_date = change['date']
-            
-            # If leaving a cycle time status
-            if from_status in self.cycle_time_statuses and current_cycle_start:
-                duration = (change_date - current_cycle_start).total_seconds() / 3600
-                total_cycle_time += duration
-                
-                status_periods.append({
-                    'status': from_status,
-                    'start': current_cycle_start,
-                    'end': change_date,
-                    'duration_hours': duration
-                })
-                
-                current_cycle_start = None
-            
-            # If entering a cycle time status
-            if to_status in self.cycle_time_statuses:
-                current_cycle_start = change_date
-        
+
+        for i in np.flatnonzero(contributing):
+            start_date = change_dates[start_indices[i]] if start_indices[i] >= 0 else created_date
+            status_periods.append({
+                'status': from_statuses[i],
+                'start': start_date,
+                'end': change_dates[i],
+                'duration_hours': (change_dates[i] - start_date).total_seconds() / 3600
+            })
+
         # Handle case where issue is still in a cycle time status
         current_status = issue['fields']['status']['name']
-        if current_status in self.cycle_time_statuses and current_cycle_start:
-            end_date = datetime.now(current_cycle_start.tzinfo)
+        if current_status in self.cycle_time_statuses and open_active:
+            start_date = change_dates[open_start] if open_start >= 0 else created_date
+            end_date = datetime.now(start_date.tzinfo)
             if issue['fields'].get('resolutiondate'):
                 end_date = self.parse_datetime(issue['fields']['resolutiondate'])
-            
-            duration = (end_date - current_cycle_start).total_seconds() / 3600
-            total_cycle_time += duration
-            
+
+            duration_hours = (end_date - start_date).total_seconds() / 3600
+            total_cycle_time += duration_hours / 24
+
             status_periods.append({
                 'status': current_status,
-                'start': current_cycle_start,
+                'start': start_date,
                 'end': end_date,
-                'duration_hours': duration
+                'duration_hours': duration_hours
             })
-        
+
         return total_cycle_time, status_periods
     
-    def extract_metrics(self, jql: str, max_results: int = 100) -> List[Dict]:
-        """Extract cycle time metrics for issues matching the JQL query."""
+    def extract_metrics(self, jql: str, max_results: int = 100) -> Iterator[Dict]:
+        """
+        Extract cycle time metrics for issues matching the JQL query.
+
+        Yields one metric dict per issue so large result sets can be
+        streamed straight to disk without holding everything in memory.
+        """
         print(f"Fetching issues with JQL: {jql}")
         issues = self.get_issues(jql, max_results)
         print(f"Found {len(issues)} issues")
-        
-        metrics = []
-        
+
         for issue in issues:
             key = issue['key']
             fields = issue['fields']
             
             cycle_time, status_periods = self.calculate_cycle_time(issue)
             
-            metrics.append({
+            yield {
                 'key': key,
                 'summary': fields['summary'],
                 'status': fields['status']['name'],
@@ -313,30 +452,59 @@ class JiraMetricsExtractor:
                 'assignee': fields.get('assignee', {}).get('displayName') if fields.get('assignee') else None,
                 'priority': fields.get('priority', {}).get('name') if fields.get('priority') else None,
                 'issue_type': fields.get('issuetype', {}).get('name') if fields.get('issuetype') else None,
-                'cycle_time_hours': cycle_time,
-                'cycle_time_days': cycle_time / 24 if cycle_time > 0 else 0,
+                'cycle_time_days': cycle_time,
                 'status_periods': status_periods
-            })
-        
-        return metrics
-    
-    def export_to_csv(self, metrics: List[Dict], filename: str):
-        """Export metrics to CSV file."""
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = [
-                'key', 'summary', 'status', 'created', 'resolved', 'assignee',
-                'priority', 'issue_type', 'cycle_time_hours', 'cycle_time_days'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for metric in metrics:
-                # Remove status_periods for CSV export (too complex)
-                row = {k: v for k, v in metric.items() if k != 'status_periods'}
-                writer.writerow(row)
-        
+            }
+
+    # Rows buffered per chunk before handing off to pandas' C CSV writer
+    CSV_CHUNK_ROWS = 10000
+
+    def export_to_csv(self, metrics: Iterable[Dict], filename: str):
+        """Export metrics to CSV file, streaming chunks through pandas."""
+        fieldnames = [
+            'key', 'summary', 'status', 'created', 'resolved', 'assignee',
+            'priority', 'issue_type', 'cycle_time_days'
+        ]
+
+        # Accumulate columnar chunks; status_periods never enters the
+        # export since only the listed fields are copied
+        chunk = {name: [] for name in fieldnames}
+        first_chunk = True
+
+        for metric in metrics:
+            for name in fieldnames:
+                chunk[name].append(metric[name])
+
+            if len(chunk['key']) >= self.CSV_CHUNK_ROWS:
+                self._write_csv_chunk(chunk, filename, first_chunk)
+                first_chunk = False
+                chunk = {name: [] for name in fieldnames}
+
+        # Final flush also emits the header for empty result sets
+        self._write_csv_chunk(chunk, filename, first_chunk)
+
         print(f"Metrics exported to {filename}")
 
+    @staticmethod
+    def _write_csv_chunk(chunk: Dict[str, List], filename: str, first_chunk: bool):
+        """Append one columnar chunk to the CSV via DataFrame.to_csv."""
+        pd.DataFrame(chunk).to_csv(filename, mode='w' if first_chunk else 'a',
+                                   header=first_chunk, index=False)
+
+
+def _tee_json(metrics: Iterable[Dict], filename: str) -> Iterator[Dict]:
+    """Pass metrics through while incrementally writing them to a JSON array."""
+    with open(filename, 'wb') as f:
+        f.write(b'[')
+        first = True
+        for metric in metrics:
+            if not first:
+                f.write(b',\n')
+            f.write(orjson.dumps(metric, option=orjson.OPT_INDENT_2, default=str))
+            first = False
+            yield metric
+        f.write(b']')
+
 
 def main():
     parser = argparse.ArgumentParser(description='Extract JIRA cycle time metrics')
@@ -369,24 +537,35 @@ def main():
         
         print(f"Rate limit set to {args.rate_limit} requests per minute")
         
-        metrics = extractor.extract_metrics(args.jql, args.max_results)
-        
-        # Export to CSV
-        extractor.export_to_csv(metrics, args.output)
-        
-        # Export to JSON if requested
+        # Stream metrics straight to disk, keeping only the summary numbers
+        cycle_days = []
+
+        def tally(stream):
+            for metric in stream:
+                cycle_days.append(metric['cycle_time_days'])
+                yield metric
+
+        metrics = tally(extractor.extract_metrics(args.jql, args.max_results))
+
+        # Tee into an incremental JSON writer if requested
+        json_filename = None
         if args.json:
-            json_filename = args.output.replace('.csv', '.json')
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump(metrics, f, indent=2, default=str)
+            json_filename = str(Path(args.output).with_suffix('.json'))
+            metrics = _tee_json(metrics, json_filename)
+
+        # Export to CSV (drives the whole pipeline)
+        extractor.export_to_csv(metrics, args.output)
+
+        if json_filename:
             print(f"Detailed metrics exported to {json_filename}")
-        
-        # Print summary
-        if metrics:
-            avg_cycle_time = sum(m['cycle_time_hours'] for m in metrics) / len(metrics)
+
+        # Print summary (vectorized reduction, no float boxing)
+        if cycle_days:
+            avg_cycle_time = float(np.fromiter(cycle_days, dtype=np.float64,
+                                               count=len(cycle_days)).mean())
             print(f"\nSummary:")
-            print(f"Total issues: {len(metrics)}")
-            print(f"Average cycle time: {avg_cycle_time:.1f} hours ({avg_cycle_time/24:.1f} days)")
+            print(f"Total issues: {len(cycle_days)}")
+            print(f"Average cycle time: {avg_cycle_time:.1f} days")
             print(f"Cycle time statuses: {', '.join(args.statuses)}")
     
     except requests.exceptions.RequestException as e:
@@ -6,78 +6,120 @@ Automatically loads credentials from .env file for simplified usage.
 """
 
 import os
+import re
 import sys
+import csv
 import argparse
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 
-# Import the original extractor
-from jira_metrics import JiraMetricsExtractor
+# pandas, orjson and the extractor (which pulls in numpy and requests) are
+# imported lazily inside main() so --help and the missing-credentials path
+# keep a fast cold start
+
+# Matches KEY=VALUE lines; the leading identifier requirement also skips
+# comment lines, so the whole file parses in one C-level sweep. Whitespace
+# must be horizontal-only ([ \t]): \s matches newlines under (?m), which
+# would let an empty value swallow the following line
+_ENV_RE = re.compile(r'(?m)^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t]*$')
+
+
+@lru_cache(maxsize=8)
+def _load_env_cached(env_path: str, mtime: float) -> tuple:
+    """Parse a .env file; mtime is part of the cache key so edits invalidate."""
+    text = Path(env_path).read_text()
+
+    # Immutable so the cached value cannot be mutated by callers; duplicate
+    # keys resolve last-wins when converted to a dict, as before
+    return tuple(_ENV_RE.findall(text))
 
 
 def load_env_file(env_path: str = '.env') -> dict:
-    """Load environment variables from .env file."""
-    env_vars = {}
-    
-    if not os.path.exists(env_path):
-        return env_vars
-    
-    with open(env_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                env_vars[key.strip()] = value.strip()
-    
-    return env_vars
+    """Load environment variables from .env file (memoized per path+mtime)."""
+    # EAFP: one stat instead of an exists() pre-check plus the read
+    try:
+        return dict(_load_env_cached(env_path, os.path.getmtime(env_path)))
+    except FileNotFoundError:
+        return {}
 
 
-def main():
-    # Load environment variables
-    env_vars = load_env_file()
-    
+@lru_cache(maxsize=1)
+def _presets() -> MappingProxyType:
+    """JQL presets, resolved against .env once and frozen."""
+    ev = load_env_file()
+    return MappingProxyType({
+        'recent': ev.get('JQL_RECENT_RESOLVED', 'project = TAS AND resolved >= -30d'),
+        'sprint': ev.get('JQL_CURRENT_SPRINT', 'project = TAS AND sprint in openSprints()'),
+        '2025': ev.get('JQL_2025_RESOLVED', 'project = TAS AND resolved >= "2025-01-01"'),
+        'stories': ev.get('JQL_STORIES_ONLY', 'project = TAS AND issuetype = Story AND resolved >= -30d')
+    })
+
+
+@lru_cache(maxsize=1)
+def _build_parser(url: str, username: str, token: str,
+                  max_results: str, rate_limit: str) -> argparse.ArgumentParser:
+    """Build the argument parser once per set of .env defaults.
+
+    Caching it avoids the ~10 add_argument calls on every invocation in
+    warm processes that call main() repeatedly.
+    """
     parser = argparse.ArgumentParser(description='Extract JIRA cycle time metrics (easy mode)')
-    
+
     # Credentials (with defaults from .env)
-    parser.add_argument('--url', default=env_vars.get('JIRA_URL'), 
-                       help=f'JIRA base URL (default: {env_vars.get("JIRA_URL", "from .env file")})')
-    parser.add_argument('--username', default=env_vars.get('JIRA_USERNAME'),
-                       help=f'JIRA username (default: {env_vars.get("JIRA_USERNAME", "from .env file")})')
-    parser.add_argument('--token', default=env_vars.get('JIRA_API_TOKEN'),
+    parser.add_argument('--url', default=url,
+                       help=f'JIRA base URL (default: {url or "from .env file"})')
+    parser.add_argument('--username', default=username,
+                       help=f'JIRA username (default: {username or "from .env file"})')
+    parser.add_argument('--token', default=token,
                        help='JIRA API token (default: from .env file)')
-    
+
     # Common JQL presets
-    parser.add_argument('--preset', choices=['recent', 'sprint', '2025', 'stories'], 
+    parser.add_argument('--preset', choices=['recent', 'sprint', '2025', 'stories'],
                        help='Use predefined JQL query')
     parser.add_argument('--jql', help='Custom JQL query (overrides preset)')
-    
+
     # Settings with defaults from .env
-    parser.add_argument('--max-results', type=int, 
-                       default=int(env_vars.get('DEFAULT_MAX_RESULTS', 1000)),
+    # String defaults are run through type= lazily by argparse, so the int
+    # conversion only happens for whichever default is actually used
+    parser.add_argument('--max-results', type=int, default=max_results,
                        help='Maximum number of issues to process')
-    parser.add_argument('--rate-limit', type=int,
-                       default=int(env_vars.get('DEFAULT_RATE_LIMIT', 60)),
+    parser.add_argument('--rate-limit', type=int, default=rate_limit,
                        help='Maximum requests per minute')
-    
+
     # Output options
-    parser.add_argument('--output', default='metrics.csv', help='Output CSV filename')
+    parser.add_argument('--output', default='metrics.csv', help='Output filename')
+    parser.add_argument('--format', choices=['csv', 'parquet', 'feather'], default='csv',
+                       help='Output format (parquet/feather are columnar: smaller files, '
+                            'much faster for downstream analysis)')
     parser.add_argument('--json', action='store_true', help='Also output detailed JSON')
-    parser.add_argument('--analyze', action='store_true', 
+    parser.add_argument('--analyze', action='store_true',
                        help='Run statistical analysis after extraction')
-    
+
     # Status customization
-    parser.add_argument('--statuses', nargs='+', 
+    parser.add_argument('--statuses', nargs='+',
                        default=['Doing', 'Blocked', 'Review', 'In Progress', 'In Review'],
                        help='Status names that count toward cycle time')
-    
+
+    return parser
+
+
+def main():
+    # Load environment variables
+    env_vars = load_env_file()
+
+    parser = _build_parser(env_vars.get('JIRA_URL'),
+                           env_vars.get('JIRA_USERNAME'),
+                           env_vars.get('JIRA_API_TOKEN'),
+                           env_vars.get('DEFAULT_MAX_RESULTS', '1000'),
+                           env_vars.get('DEFAULT_RATE_LIMIT', '60'))
     args = parser.parse_args()
     
-    # Check required credentials
-    if not all([args.url, args.username, args.token]):
-        missing = []
-        if not args.url: missing.append('JIRA_URL')
-        if not args.username: missing.append('JIRA_USERNAME') 
-        if not args.token: missing.append('JIRA_API_TOKEN')
-        
+    # Check required credentials in one pass
+    required = (('url', 'JIRA_URL'), ('username', 'JIRA_USERNAME'),
+                ('token', 'JIRA_API_TOKEN'))
+    missing = [name for attr, name in required if not getattr(args, attr)]
+    if missing:
         print(f"Error: Missing credentials. Please set in .env file: {', '.join(missing)}")
         print("\nCreate a .env file with:")
         print("JIRA_URL=https://your-company.atlassian.net")
@@ -89,68 +131,128 @@ def main():
     if args.jql:
         jql = args.jql
     elif args.preset:
-        presets = {
-            'recent': env_vars.get('JQL_RECENT_RESOLVED', 'project = TAS AND resolved >= -30d'),
-            'sprint': env_vars.get('JQL_CURRENT_SPRINT', 'project = TAS AND sprint in openSprints()'),
-            '2025': env_vars.get('JQL_2025_RESOLVED', 'project = TAS AND resolved >= "2025-01-01"'),
-            'stories': env_vars.get('JQL_STORIES_ONLY', 'project = TAS AND issuetype = Story AND resolved >= -30d')
-        }
-        jql = presets[args.preset]
+        jql = _presets()[args.preset]
     else:
         # Default to recent resolved issues
-        jql = env_vars.get('JQL_RECENT_RESOLVED', 'project = TAS AND resolved >= -30d')
+        jql = _presets()['recent']
     
     try:
-        print(f"🔐 Connecting to: {args.url}")
-        print(f"👤 User: {args.username}")
-        print(f"🔍 Query: {jql}")
-        print(f"⚡ Rate limit: {args.rate_limit} requests/minute")
-        print(f"📊 Max results: {args.max_results}")
-        print()
-        
-        # Initialize extractor
-        extractor = JiraMetricsExtractor(args.url, args.username, args.token)
-        extractor.set_cycle_time_statuses(args.statuses)
-        extractor.set_rate_limit(args.rate_limit)
-        
-        # Extract metrics
+        # Bind the hot args to locals once
+        url, user, token = args.url, args.username, args.token
+        statuses, rate = args.statuses, args.rate_limit
+
+        # One buffered write for the banner instead of a syscall per line
+        banner = [
+            f"🔐 Connecting to: {url}",
+            f"👤 User: {user}",
+            f"🔍 Query: {jql}",
+            f"⚡ Rate limit: {rate} requests/minute",
+            f"📊 Max results: {args.max_results}",
+            ""
+        ]
+        sys.stdout.write("\n".join(banner) + "\n")
+        sys.stdout.flush()
+
+        # Initialize extractor (first touch of the heavy dependencies)
+        from jira_metrics import JiraMetricsExtractor
+
+        extractor = JiraMetricsExtractor(url, user, token)
+        extractor.set_cycle_time_statuses(statuses)
+        extractor.set_rate_limit(rate)
+
         metrics = extractor.extract_metrics(jql, args.max_results)
+
+        # JSON, analysis and the columnar formats need the whole result set;
+        # plain CSV streams row by row with constant memory, overlapping the
+        # network fetch with the disk write
+        needs_frame = args.json or args.analyze or args.format != 'csv'
+
+        if needs_frame:
+            import pandas as pd
+
+            df = pd.DataFrame(metrics)
+
+            if df.empty:
+                print("❌ No issues found matching the query.")
+                return
+
+            issue_count = len(df)
+            avg_cycle_time = df['cycle_time_days'].mean()
+
+            # Export results; status_periods stays internal, as before
+            export_columns = [c for c in df.columns if c != 'status_periods']
+            output = args.output
+            if args.format != 'csv':
+                output = str(Path(output).with_suffix(f'.{args.format}'))
+
+            if args.format == 'parquet':
+                df[export_columns].to_parquet(output, compression='zstd',
+                                              compression_level=3, index=False)
+            elif args.format == 'feather':
+                df[export_columns].reset_index(drop=True).to_feather(output)
+            else:
+                df.to_csv(output, index=False, columns=export_columns)
+
+            if args.json:
+                import orjson
+
+                json_filename = str(Path(args.output).with_suffix('.json'))
+                # orjson handles datetimes natively; default=str covers
+                # anything else nested inside status_periods
+                with open(json_filename, 'wb') as f:
+                    f.write(orjson.dumps(
+                        df.to_dict('records'),
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+                        default=str))
+                print(f"📄 Detailed metrics: {json_filename}")
+        else:
+            output = args.output
+            issue_count = 0
+            cycle_time_sum = 0.0
+
+            # 1 MiB buffer keeps write() syscalls rare; the header is taken
+            # from the first row so the file stays empty when nothing matches
+            with open(output, 'w', newline='', buffering=1 << 20) as f:
+                writer = None
+                for metric in metrics:
+                    row = {k: v for k, v in metric.items()
+                           if k != 'status_periods'}
+                    if writer is None:
+                        writer = csv.DictWriter(f, fieldnames=list(row))
+                        writer.writeheader()
+                    writer.writerow(row)
+                    issue_count += 1
+                    cycle_time_sum += metric['cycle_time_days']
+
+            if not issue_count:
+                print("❌ No issues found matching the query.")
+                return
+
+            avg_cycle_time = cycle_time_sum / issue_count
+
+        print(f"✅ Metrics exported: {output}")
         
-        if not metrics:
-            print("❌ No issues found matching the query.")
-            return
-        
-        # Export results
-        extractor.export_to_csv(metrics, args.output)
-        
-        if args.json:
-            json_filename = args.output.replace('.csv', '.json')
-            import json
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump(metrics, f, indent=2, default=str)
-            print(f"📄 Detailed metrics: {json_filename}")
-        
-        print(f"✅ Metrics exported: {args.output}")
-        
-        # Run analysis if requested
+        # Run analysis if requested (in-process: no interpreter startup and
+        # no re-read of the file we just wrote)
         if args.analyze:
             print(f"\n🔬 Running statistical analysis...")
             try:
-                os.system(f"python3 analyze_cycle_times.py {args.output} --method iqr")
+                from analyze_cycle_times import analyze
+                analyze(df[export_columns], method='iqr')
             except Exception as e:
                 print(f"Analysis failed: {e}")
         
         # Print summary
-        cycle_times = [m['cycle_time_days'] for m in metrics]
-        avg_cycle_time = sum(cycle_times) / len(cycle_times) if cycle_times else 0
-        
-        print(f"\n📈 Quick Summary:")
-        print(f"   Issues analyzed: {len(metrics)}")
-        print(f"   Average cycle time: {avg_cycle_time:.1f} days")
-        print(f"   Cycle time statuses: {', '.join(args.statuses)}")
-        
+        summary = [
+            "",
+            "📈 Quick Summary:",
+            f"   Issues analyzed: {issue_count}",
+            f"   Average cycle time: {avg_cycle_time:.1f} days",
+            f"   Cycle time statuses: {', '.join(statuses)}",
+        ]
         if avg_cycle_time > 15:
-            print(f"   💡 Tip: High average suggests outliers. Use --analyze flag!")
+            summary.append("   💡 Tip: High average suggests outliers. Use --analyze flag!")
+        sys.stdout.write("\n".join(summary) + "\n")
         
     except Exception as e:
         print(f"❌ Error: {e}")